@@ -318,13 +318,13 @@ def update(
                     }
 
                     git_change = GitChange(
-                        file_path=Path(change.file_path),
+                        file_path=change.file_path,
                         change_type=change_type_mapping.get(
                             change.change_type, ChangeType.MODIFIED
                         ),
                         lines_added=change.lines_added,
                         lines_removed=change.lines_removed,
-                        old_path=change.old_path if change.old_path else None,
+                        old_path=change.old_path,
                     )
                     git_changes.append(git_change)
 
@@ -243,6 +243,8 @@ You can manually process it with:
             self.git_analysis = self.git_repo.analyze_repository(
                 path_filter=self.config.path_filter,
                 excluded_patterns=self.config.get_excluded_patterns(),
+                # The change summary reports renames as their own bucket
+                find_renames=True,
             )
         else:
             self._update_progress(
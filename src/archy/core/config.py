@@ -8,6 +8,7 @@ type-safe Pydantic models and comprehensive security checks.
 import os
 import re
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -66,7 +67,6 @@ class ArchyConfig(BaseModel):
     git_root: Optional[Path] = Field(default=None, exclude=True)
     arch_file_path: Optional[Path] = Field(default=None, exclude=True)
     path_filter: Optional[str] = Field(default=None, exclude=True)
-    default_branch: Optional[str] = Field(default=None, exclude=True)
 
     # Security and validation constants
     MAX_PATH_LENGTH: int = Field(default=4096, exclude=True)
@@ -223,9 +223,6 @@ class ArchyConfig(BaseModel):
         else:
             self.path_filter = ""
 
-        # Detect default branch
-        self.default_branch = self._detect_default_branch(self.git_root)
-
         # Construct final architecture file path
         self.arch_file_path = self.analysis_target_abs / self.arch_filename
 
@@ -245,6 +242,17 @@ class ArchyConfig(BaseModel):
         except ArchyGitError:
             return None
 
+    @cached_property
+    def default_branch(self) -> str:
+        """
+        Default branch name of the repository.
+
+        Detected on first access only, since fresh mode never needs it.
+        """
+        if not self.git_root:
+            return "main"
+        return self._detect_default_branch(self.git_root)
+
     def _detect_default_branch(self, git_root: Path) -> str:
         """Detect the default branch name using GitRepository."""
         try:
@@ -260,30 +268,38 @@ class ArchyConfig(BaseModel):
         """Validate that we can write to the target file location."""
         dir_path = filepath.parent
 
-        # Check if directory is writable
-        if not dir_path.exists():
+        # Check if directory is writable. access() fails for a missing
+        # directory too, so only stat/create it when the check fails.
+        if not os.access(dir_path, os.W_OK):
+            if dir_path.exists():
+                raise ArchyConfigError(f"Cannot write to directory: {dir_path}")
             try:
                 dir_path.mkdir(parents=True, exist_ok=True)
             except Exception as e:
                 raise ArchyConfigError(f"Cannot create directory: {dir_path}") from e
+            if not os.access(dir_path, os.W_OK):
+                raise ArchyConfigError(f"Cannot write to directory: {dir_path}")
 
-        if not os.access(dir_path, os.W_OK):
-            raise ArchyConfigError(f"Cannot write to directory: {dir_path}")
-
-        # If file exists, check if it's writable
-        if filepath.exists() and not os.access(filepath, os.W_OK):
+        # If file exists, check if it's writable (existence only checked on failure)
+        if not os.access(filepath, os.W_OK) and filepath.exists():
             raise ArchyConfigError(f"Cannot overwrite existing file: {filepath}")
 
     def get_excluded_patterns(self) -> list[str]:
         """Get the list of file patterns to exclude from analysis."""
         return self.EXCLUDED_PATTERNS
 
+    @cached_property
+    def _excluded_re(self) -> Optional[re.Pattern[str]]:
+        """Excluded patterns compiled once into a single alternation."""
+        # Import here to avoid circular imports
+        from .git_ops import compile_excluded_patterns
+
+        return compile_excluded_patterns(self.EXCLUDED_PATTERNS)
+
     def should_exclude_file(self, file_path: str) -> bool:
         """Check if a file should be excluded based on patterns."""
-        for pattern in self.EXCLUDED_PATTERNS:
-            if pattern in file_path:
-                return True
-        return False
+        excluded_re = self._excluded_re
+        return excluded_re is not None and excluded_re.search(file_path) is not None
 
 
 class ArchySettings(BaseSettings):
@@ -342,11 +358,19 @@ class MultiPRConfig(BaseModel):
     @model_validator(mode="after")
     def validate_unique_prs(self) -> "MultiPRConfig":
         """Ensure no duplicate repo#number combinations."""
-        seen = set()
+        # Fast path: one set construction covers the common all-unique case
+        if len({(pr_spec.repo, pr_spec.number) for pr_spec in self.prs}) == len(
+            self.prs
+        ):
+            return self
+
+        seen: set[tuple[str, int]] = set()
         for pr_spec in self.prs:
-            key = f"{pr_spec.repo}#{pr_spec.number}"
+            key = (pr_spec.repo, pr_spec.number)
             if key in seen:
-                raise ValueError(f"Duplicate PR specification: {key}")
+                raise ValueError(
+                    f"Duplicate PR specification: {pr_spec.repo}#{pr_spec.number}"
+                )
             seen.add(key)
         return self
 
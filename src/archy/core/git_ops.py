@@ -5,10 +5,24 @@ This module replaces all bash git commands with proper Python GitPython calls,
 providing better error handling and cross-platform compatibility.
 """
 
+import gzip
+import hashlib
+import http.client
+import json
+import os
 import re
 import subprocess
-from dataclasses import dataclass
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+import weakref
+import zlib
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
@@ -16,6 +30,21 @@ from git import InvalidGitRepositoryError, Repo
 
 from ..exceptions import ArchyGitError
 
+try:
+    # Optional multi-pattern matcher for PR file exclusion (pip install archy[fast])
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS: dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Upper bound on concurrent PR diff fetches
+_MAX_PR_FETCH_WORKERS = 16
+
+# GitHub REST API root; GitHub Actions sets GITHUB_API_URL for GHES hosts
+_GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+
 
 class ChangeType(str, Enum):
     """Types of git changes."""
@@ -26,23 +55,57 @@ class ChangeType(str, Enum):
     RENAMED = "renamed"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class GitChange:
     """Represents a single git file change."""
 
-    file_path: Path
+    file_path: str  # POSIX path relative to the git root, as reported by git
     change_type: ChangeType
     lines_added: int = 0
     lines_removed: int = 0
-    old_path: Optional[Path] = None  # For renames
+    old_path: Optional[str] = None  # For renames
 
+    # Where the change came from, so the patch can be generated on demand
+    # (excluded from equality, which compares the change itself)
+    base_sha: Optional[str] = field(default=None, repr=False, compare=False)
+    head_sha: Optional[str] = field(default=None, repr=False, compare=False)
+    git_root: Optional[Path] = field(default=None, repr=False, compare=False)
+    _patch: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
+    @property
+    def patch(self) -> str:
+        """
+        Unified diff for this file, produced by git on first access.
+
+        Counts come from numstat, so callers that never read the patch never
+        pay for generating it. Empty when the change has no source commits.
+        """
+        if self._patch is None:
+            if not (self.base_sha and self.head_sha and self.git_root):
+                return ""
+
+            paths = [self.file_path]
+            if self.old_path:
+                paths.insert(0, self.old_path)
+            output = _git_output(
+                self.git_root,
+                "diff",
+                "-M",
+                self.base_sha,
+                self.head_sha,
+                "--",
+                *(f":(literal){path}" for path in paths),
+            )
+            self._patch = output.decode("utf-8", errors="replace")
+        return self._patch
+
+
+@dataclass(**_SLOTS)
 class GitAnalysis:
     """Results of git analysis for architecture generation."""
 
     changed_files: list[GitChange]
-    all_tracked_files: list[Path]
+    all_tracked_files: list[str]
     default_branch: str
     current_branch: str
     git_root: Path
@@ -60,7 +123,13 @@ class PRChange:
     lines_removed: int = 0
     pr_number: int = 0
     repo: str = ""  # "funnel-io/data-in-hatchery"
-    old_path: Optional[Path] = None  # For renames
+    old_path: Optional[str] = None  # For renames
+
+    # Lowercased once here for the case-insensitive PR scans
+    file_path_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.file_path_lower = self.file_path.lower()
 
 
 @dataclass
@@ -74,7 +143,9 @@ class PRDiff:
     summary: str  # Brief description
     description: str = ""  # Optional detailed description
     focus_areas: Optional[list[str]] = None  # Optional focus areas
-    raw_diff: str = ""  # Full PR diff content for AI analysis
+    # Full PR diff content for AI analysis, zlib-compressed; see raw_diff.
+    # Replaces the former raw_diff= argument: pass zlib.compress(diff_bytes).
+    compressed_diff: bytes = field(default=b"", repr=False)
 
     def __post_init__(self) -> None:
         if self.focus_areas is None:
@@ -85,6 +156,51 @@ class PRDiff:
         """Derive service name from repo name."""
         return self.repo.split("/")[-1]
 
+    @property
+    def raw_diff(self) -> str:
+        """Full PR diff content, decompressed and decoded on each access."""
+        if not self.compressed_diff:
+            return ""
+        return zlib.decompress(self.compressed_diff).decode("utf-8", errors="replace")
+
+    def iter_raw_diff(self, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        """Yield the raw diff bytes in chunks of at most chunk_size."""
+        decompressor = zlib.decompressobj()
+        data = self.compressed_diff
+        while data:
+            chunk = decompressor.decompress(data, chunk_size)
+            if chunk:
+                yield chunk
+            data = decompressor.unconsumed_tail
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def mentioned_names(self, names_lower: Iterable[str]) -> set[str]:
+        """
+        Get which of the given lowercase names occur anywhere in the diff.
+
+        Streams the decompressed diff, lowercasing one chunk at a time, so the
+        full diff is never held as text. Matching is ASCII case-insensitive.
+        """
+        needles = {name: name.encode("utf-8") for name in names_lower}
+        if not needles:
+            return set()
+
+        # Keep enough of the previous chunk to catch names split across chunks
+        overlap = max(len(needle) for needle in needles.values()) - 1
+        found: set[str] = set()
+        carry = b""
+        for chunk in self.iter_raw_diff():
+            window = carry + chunk.lower()
+            for name, needle in needles.items():
+                if name not in found and needle in window:
+                    found.add(name)
+            if len(found) == len(needles):
+                break
+            carry = window[-overlap:] if overlap else b""
+        return found
+
 
 @dataclass
 class MultiPRAnalysis:
@@ -97,6 +213,432 @@ class MultiPRAnalysis:
     service_interactions: dict[str, dict[str, list[str]]]
 
 
+# Classifies a lowercased path into the first matching change category. Each
+# branch is a lookahead anchored at the start, so branches are tried in
+# priority order rather than by leftmost keyword position. DOTALL and \Z
+# keep the old substring/endswith semantics for paths containing newlines,
+# which git allows.
+_CHANGE_CATEGORY_RE = re.compile(
+    # API specifications (HIGH PRIORITY for distributed systems)
+    r"(?P<api_specifications>(?=.*(?:swagger|openapi|api-docs)|.*api.*\.json\Z))"
+    # API endpoints and routes
+    r"|(?P<api_endpoints>(?=.*(?:api|router|controller|endpoint|route)))"
+    # Database changes
+    r"|(?P<database_changes>(?=.*(?:model|schema|migration|db|sql)))"
+    # Config changes
+    r"|(?P<config_changes>(?=.*(?:config|env|setting|constant)))",
+    re.DOTALL,
+)
+
+
+@lru_cache(maxsize=50_000)
+def _classify_path(file_path_lower: str) -> Optional[str]:
+    """
+    Get the change category of a lowercased path, or None if it has none.
+
+    Memoized because the same paths recur across PRs and services.
+    """
+    match = _CHANGE_CATEGORY_RE.match(file_path_lower)
+    return match.lastgroup if match else None
+
+
+def compile_excluded_patterns(patterns: list[str]) -> Optional[re.Pattern[str]]:
+    """
+    Combine substring exclusion patterns into one compiled alternation.
+
+    Returns None when there is nothing to exclude.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(re.escape(pattern) for pattern in patterns))
+
+
+# git diff --raw status letters; copies are reported as additions
+_STATUS_CHANGE_TYPES = {
+    "A": ChangeType.ADDED,
+    "C": ChangeType.ADDED,
+    "D": ChangeType.DELETED,
+    "M": ChangeType.MODIFIED,
+    "R": ChangeType.RENAMED,
+}
+
+
+def _parse_raw_numstat(output: bytes) -> list[tuple[str, str, Optional[str], int, int]]:
+    """
+    Parse the output of ``git diff -z --raw --numstat``.
+
+    Git prints every --raw record first and then every --numstat record, in
+    the same file order. Returns (status, path, old_path, added, removed)
+    tuples; binary files report zero line counts.
+    """
+    tokens = output.split(b"\0")
+    raw_entries: list[tuple[str, str, Optional[str]]] = []
+    line_counts: list[tuple[int, int]] = []
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+
+        if token.startswith(b":"):
+            # ":<old mode> <new mode> <old sha> <new sha> <status>" then paths
+            status = token.rsplit(b" ", 1)[-1].decode("ascii")
+            if status[0] in "RC":
+                old_path: Optional[str] = tokens[i].decode("utf-8", "surrogateescape")
+                path = tokens[i + 1].decode("utf-8", "surrogateescape")
+                i += 2
+            else:
+                old_path = None
+                path = tokens[i].decode("utf-8", "surrogateescape")
+                i += 1
+            raw_entries.append((status[0], path, old_path))
+        else:
+            # "<added>\t<removed>\t<path>"; renames leave the path empty and
+            # put the old and new paths in the next two tokens
+            added, removed, numstat_path = token.split(b"\t", 2)
+            if not numstat_path:
+                i += 2
+            line_counts.append(
+                (
+                    int(added) if added != b"-" else 0,
+                    int(removed) if removed != b"-" else 0,
+                )
+            )
+
+    # The two record streams are paired by position, so they must line up
+    if len(raw_entries) != len(line_counts):
+        raise ArchyGitError(
+            f"Mismatched git diff output: {len(raw_entries)} --raw records, "
+            f"{len(line_counts)} --numstat records"
+        )
+
+    return [
+        (status, path, old_path, added, removed)
+        for (status, path, old_path), (added, removed) in zip(raw_entries, line_counts)
+    ]
+
+
+# Single-character escapes in git's C-style quoted paths
+_C_ESCAPES = {
+    ord("a"): 0x07,
+    ord("b"): 0x08,
+    ord("t"): 0x09,
+    ord("n"): 0x0A,
+    ord("v"): 0x0B,
+    ord("f"): 0x0C,
+    ord("r"): 0x0D,
+}
+
+
+def _unquote_git_path(path: bytes) -> bytes:
+    """
+    Undo git's C-style quoting of a path.
+
+    Git quotes paths with special or non-ASCII characters, escaping bytes as
+    octal. Unquoted paths are returned unchanged.
+    """
+    if len(path) < 2 or path[:1] != b'"' or path[-1:] != b'"':
+        return path
+
+    unquoted = bytearray()
+    i, end = 1, len(path) - 1
+    while i < end:
+        byte = path[i]
+        if byte != ord("\\"):
+            unquoted.append(byte)
+            i += 1
+        elif ord("0") <= path[i + 1] <= ord("7"):
+            # "\ooo": one byte in octal
+            unquoted.append(int(path[i + 1 : i + 4], 8))
+            i += 4
+        else:
+            unquoted.append(_C_ESCAPES.get(path[i + 1], path[i + 1]))
+            i += 2
+    return bytes(unquoted)
+
+
+def _split_diff_header(paths: bytes) -> Optional[tuple[bytes, bytes]]:
+    """
+    Split the '"a/<old>" "b/<new>"' part of a diff --git header.
+
+    Returns the unquoted (old, new) paths without their a/ and b/ prefixes,
+    or None if the header cannot be parsed.
+    """
+    if paths.startswith(b'"'):
+        # Quoted old path: it ends at the first unescaped quote
+        i = 1
+        while i < len(paths) and paths[i] != ord('"'):
+            i += 2 if paths[i] == ord("\\") else 1
+        old, new = paths[: i + 1], paths[i + 2 :]
+    elif paths.endswith(b'"'):
+        # Only the new path is quoted
+        old, _, new = paths.rpartition(b' "')
+        new = b'"' + new
+    else:
+        # Unquoted paths are identical unless the file was renamed, so try
+        # splitting in the middle before looking for " b/", which may also
+        # occur inside a path
+        half = len(paths) // 2
+        if paths[half : half + 1] == b" " and paths[2:half] == paths[half + 3 :]:
+            old, new = paths[:half], paths[half + 1 :]
+        else:
+            old, separator, new = paths.partition(b" b/")
+            if not separator:
+                return None
+            new = b"b/" + new
+
+    old, new = _unquote_git_path(old), _unquote_git_path(new)
+    if not (old.startswith(b"a/") and new.startswith(b"b/")):
+        return None
+    return old[2:], new[2:]
+
+
+def _git_output(cwd: Optional[Path], *args: str) -> bytes:
+    """Run a git command in cwd (None: current directory) and return its stdout."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode("utf-8", errors="replace").strip()
+        raise ArchyGitError(f"git {args[0]} failed: {stderr}") from e
+    except FileNotFoundError as e:
+        raise ArchyGitError("git executable not found") from e
+
+    return result.stdout
+
+
+# Line echoed back by git diff-tree --stdin to mark the end of a response
+_DIFF_TREE_SENTINEL = b"--archy-end--\n"
+
+
+def _stop_process(process: "subprocess.Popen[bytes]", stderr_file: Any) -> None:
+    """Close a batch process's stdin, wait for it to exit and drop its stderr."""
+    if process.stdin:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass  # Already exited with unflushed input
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    if process.stdout:
+        process.stdout.close()
+    stderr_file.close()
+
+
+class _GitBatchProcess:
+    """
+    A long-lived git process that answers requests written to its stdin.
+
+    Used for git commands with a --stdin/--batch mode, so repeated queries
+    pay for process start-up and repository loading only once.
+    """
+
+    def __init__(self, cwd: Path, *args: str):
+        self.command = args[0]
+        # stderr goes to a file rather than a pipe, so git can never block on
+        # it while we wait for stdout; it is read back only on failure
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(
+                ["git", *args],
+                cwd=cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._stderr,
+            )
+        except FileNotFoundError as e:
+            self._stderr.close()
+            raise ArchyGitError("git executable not found") from e
+        self._finalizer = weakref.finalize(
+            self, _stop_process, self._process, self._stderr
+        )
+
+    @property
+    def alive(self) -> bool:
+        """Whether the process is running and can take requests."""
+        return self._finalizer.alive and self._process.poll() is None
+
+    def request(self, data: bytes, terminator: bytes) -> bytes:
+        """
+        Send a request and read the response up to and including terminator.
+
+        Any failure stops the process, since its output can no longer be
+        matched to requests.
+        """
+        stdin, stdout = self._process.stdin, self._process.stdout
+        if not self.alive or stdin is None or stdout is None:
+            raise ArchyGitError(f"git {self.command} is not running")
+
+        try:
+            stdin.write(data)
+            stdin.flush()
+
+            # Accumulate in a bytearray: extending bytes would copy the whole
+            # response for every chunk of a large diff
+            response = bytearray()
+            while not response.endswith(terminator):
+                chunk = os.read(stdout.fileno(), 65536)
+                if not chunk:
+                    raise self._failure()
+                response += chunk
+            return bytes(response)
+        except OSError as e:
+            raise self._failure() from e
+        except BaseException:
+            self.close()
+            raise
+
+    def _failure(self) -> ArchyGitError:
+        """Stop the process and describe why it failed, using git's stderr."""
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode("utf-8", errors="replace").strip()
+        self.close()
+
+        message = f"git {self.command} exited unexpectedly"
+        return ArchyGitError(f"{message}: {stderr}" if stderr else message)
+
+    def close(self) -> None:
+        """Stop the git process."""
+        self._finalizer()
+
+
+def _cache_dir() -> Optional[Path]:
+    """
+    Get the per-user archy cache directory, or None if there is none.
+
+    Resolved on each use rather than at import, so importing this module
+    never depends on HOME. Without XDG_CACHE_HOME or a resolvable home
+    directory (e.g. a container running as an arbitrary UID), caching is
+    skipped.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    if not cache_home:
+        home = os.path.expanduser("~")
+        if home == "~":
+            return None
+        cache_home = os.path.join(home, ".cache")
+    return Path(cache_home) / "archy"
+
+
+def _repo_cache_dir(git_root: Path) -> Optional[Path]:
+    """
+    Get the on-disk cache directory for a repository, or None if uncached.
+
+    One directory is created per repository root and is not pruned; each
+    holds only the small default-branch.json file.
+    """
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    digest = hashlib.sha1(str(git_root).encode("utf-8", "surrogateescape"))
+    return cache_dir / digest.hexdigest()[:16]
+
+
+def _write_cache_file(cache_file: Path, data: bytes) -> None:
+    """
+    Write a cache file atomically.
+
+    Caching is best-effort: if the cache cannot be written, the next call
+    simply recomputes the value.
+    """
+    tmp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        tmp_file.unlink(missing_ok=True)
+
+
+def _mtime_ns(path: Path) -> int:
+    """Get a path's modification time, or 0 if it does not exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _github_token() -> Optional[str]:
+    """Get a GitHub API token from the environment, as gh does."""
+    return os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+
+
+def _detect_default_branch(repo: Repo) -> str:
+    """Detect the default branch name of a repository."""
+    branch_name = "main"  # Default fallback
+
+    # Try to get the default branch from origin/HEAD. GitPython's ref list
+    # raises IndexError (not KeyError) for a missing name.
+    try:
+        origin_head = repo.refs["origin/HEAD"]
+        branch_name = origin_head.reference.name.split("/", 1)[-1]
+    except (IndexError, KeyError, AttributeError, TypeError):
+        # Fallback: check common default branches against the local heads,
+        # listed once rather than once per candidate
+        try:
+            head_paths = {head.path for head in repo.heads}
+        except Exception:
+            head_paths = set()
+
+        for candidate in ["main", "master", "develop"]:
+            if f"refs/heads/{candidate}" in head_paths:
+                branch_name = candidate
+                break
+        else:
+            # Final fallback: use current branch
+            try:
+                branch_name = repo.active_branch.name
+            except Exception:
+                branch_name = "main"  # Ultimate fallback
+
+    return branch_name
+
+
+@lru_cache(maxsize=32)
+def _default_branch_cached(git_root: Path, refs_fingerprint: tuple[int, ...]) -> str:
+    """
+    Detect the default branch, cached in memory and on disk.
+
+    refs_fingerprint holds modification times of the ref files and
+    directories the detection reads; any branch change invalidates it.
+    """
+    cache_dir = _repo_cache_dir(git_root)
+    if cache_dir is None:
+        return _detect_default_branch(Repo(git_root))
+    cache_file = cache_dir / "default-branch.json"
+
+    try:
+        cached = json.loads(cache_file.read_bytes())
+        if tuple(cached["fingerprint"]) == refs_fingerprint:
+            return str(cached["branch"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    branch_name = _detect_default_branch(Repo(git_root))
+    _write_cache_file(
+        cache_file,
+        json.dumps(
+            {"fingerprint": list(refs_fingerprint), "branch": branch_name}
+        ).encode("utf-8"),
+    )
+    return branch_name
+
+
 class GitRepository:
     """
     Git operations wrapper using GitPython.
@@ -111,6 +653,7 @@ class GitRepository:
         self._repo: Optional[Repo] = None
         self._git_root: Optional[Path] = None
         self._default_branch: Optional[str] = None
+        self._batch_processes: dict[tuple[str, ...], _GitBatchProcess] = {}
 
         if not dry_run:
             self._initialize_repo()
@@ -122,17 +665,18 @@ class GitRepository:
     def _initialize_repo(self) -> None:
         """Initialize the git repository and find root."""
         try:
-            # Find git repository root starting from given path
-            current = self.path.resolve()
-            while current != current.parent:
-                if (current / ".git").exists():
-                    self._git_root = current
-                    self._repo = Repo(current)
-                    break
-                current = current.parent
+            # Let git find the working tree root in one call instead of
+            # walking parent directories; this also copes with worktrees,
+            # where .git is a file
+            toplevel = _git_output(
+                None, "-C", str(self.path), "rev-parse", "--show-toplevel"
+            )
+        except ArchyGitError as e:
+            raise ArchyGitError(f"Invalid git repository: {self.path}") from e
 
-            if not self._repo:
-                raise ArchyGitError(f"Not a git repository: {self.path}")
+        try:
+            self._git_root = Path(os.fsdecode(toplevel.rstrip(b"\n")))
+            self._repo = Repo(self._git_root)
 
         except InvalidGitRepositoryError as e:
             raise ArchyGitError(f"Invalid git repository: {self.path}") from e
@@ -155,6 +699,58 @@ class GitRepository:
             raise ArchyGitError("Git root not found")
         return self._git_root
 
+    def _run_git(self, *args: str) -> bytes:
+        """Run a git command in the repository root and return its raw stdout."""
+        if self.dry_run:
+            raise ArchyGitError("Git operations not available in dry-run mode")
+
+        return _git_output(self.git_root, *args)
+
+    def _batch_process(self, *args: str) -> _GitBatchProcess:
+        """Get the long-lived git process for these arguments, starting it once."""
+        if self.dry_run:
+            raise ArchyGitError("Git operations not available in dry-run mode")
+
+        process = self._batch_processes.get(args)
+        if process is None or not process.alive:
+            # Replace a process that died (or was stopped after a failure)
+            process = _GitBatchProcess(self.git_root, *args)
+            self._batch_processes[args] = process
+        return process
+
+    def _resolve_commit(self, ref: str) -> Optional[str]:
+        """Resolve a ref to a commit sha, or None if it does not exist."""
+        response = self._batch_process("cat-file", "--batch-check").request(
+            f"{ref}^{{commit}}\n".encode("utf-8", "surrogateescape"), b"\n"
+        )
+        sha, _, object_type = response.decode("ascii", "replace").partition(" ")
+        return sha if object_type.startswith("commit") else None
+
+    def _merge_base(self, base_sha: str, head_sha: str) -> Optional[str]:
+        """Get the merge base of two commits, or None if they have none."""
+        try:
+            result = subprocess.run(
+                ["git", "merge-base", base_sha, head_sha],
+                cwd=self.git_root,
+                capture_output=True,
+            )
+        except FileNotFoundError as e:
+            raise ArchyGitError("git executable not found") from e
+
+        # Exit status 1 without output means no common ancestor was found
+        if result.returncode == 1 and not result.stderr.strip():
+            return None
+        if result.returncode:
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
+            raise ArchyGitError(f"git merge-base failed: {stderr}")
+        return result.stdout.decode("ascii").strip()
+
+    def close(self) -> None:
+        """Stop any long-lived git processes started by this repository."""
+        for process in self._batch_processes.values():
+            process.close()
+        self._batch_processes.clear()
+
     def get_default_branch(self) -> str:
         """
         Detect the default branch name.
@@ -165,36 +761,28 @@ class GitRepository:
             return self._default_branch
 
         try:
-            branch_name = "main"  # Default fallback
-
-            # Try to get the default branch from origin/HEAD
-            try:
-                origin_head = self.repo.refs["origin/HEAD"]
-                branch_name = origin_head.reference.name.split("/")[-1]
-            except (KeyError, AttributeError):
-                # Fallback: check common default branches
-                for candidate in ["main", "master", "develop"]:
-                    try:
-                        if f"refs/heads/{candidate}" in [
-                            ref.name for ref in self.repo.refs
-                        ]:
-                            branch_name = candidate
-                            break
-                    except Exception:
-                        continue
-                else:
-                    # Final fallback: use current branch
-                    try:
-                        branch_name = self.repo.active_branch.name
-                    except Exception:
-                        branch_name = "main"  # Ultimate fallback
-
-            self._default_branch = branch_name
-            return branch_name
+            self._default_branch = _default_branch_cached(
+                self.git_root, self._refs_fingerprint()
+            )
+            return self._default_branch
 
         except Exception as e:
             raise ArchyGitError(f"Failed to detect default branch: {e}") from e
 
+    def _refs_fingerprint(self) -> tuple[int, ...]:
+        """Modification times of everything default branch detection depends on."""
+        common_dir = Path(self.repo.common_dir)
+        return tuple(
+            _mtime_ns(path)
+            for path in (
+                Path(self.repo.git_dir) / "HEAD",
+                common_dir / "packed-refs",
+                common_dir / "refs" / "heads",
+                common_dir / "refs" / "remotes" / "origin",
+                common_dir / "refs" / "remotes" / "origin" / "HEAD",
+            )
+        )
+
     def get_current_branch(self) -> str:
         """Get the current branch name."""
         try:
@@ -203,116 +791,156 @@ class GitRepository:
             raise ArchyGitError(f"Failed to get current branch: {e}") from e
 
     def get_changed_files(
-        self, base_branch: Optional[str] = None, path_filter: Optional[str] = None
+        self,
+        base_branch: Optional[str] = None,
+        path_filter: Optional[str] = None,
+        excluded_re: Optional[re.Pattern[str]] = None,
+        find_renames: bool = False,
     ) -> list[GitChange]:
         """
         Get files changed between base branch and current HEAD.
 
+        Files matching excluded_re are dropped while the list is built.
+        Rename detection is opt-in via find_renames; without it a renamed
+        file is reported as a deletion plus an addition and old_path is
+        never set.
+
         Replaces bash: git diff --name-only "$DEFAULT_BRANCH...HEAD"
         """
         if not base_branch:
             base_branch = self.get_default_branch()
 
         try:
-            changes = []
-
-            # Get the diff between base branch and HEAD
-            try:
-                base_commit = self.repo.commit(f"origin/{base_branch}")
-            except Exception:
-                # Fallback to local branch if origin doesn't exist
-                try:
-                    base_commit = self.repo.commit(base_branch)
-                except Exception:
-                    # If branch doesn't exist, compare with HEAD~1
-                    try:
-                        base_commit = self.repo.commit("HEAD~1")
-                    except Exception:
-                        # Very first commit - no changes to analyze
-                        return []
-
-            head_commit = self.repo.head.commit
-
-            # Get the diff
-            diff = base_commit.diff(head_commit)
-
-            for item in diff:
-                path_str = item.a_path or item.b_path
-                if not path_str:
-                    continue  # Skip items with no path
-                file_path = Path(path_str)
+            # Resolve the base: origin branch, then local branch, then HEAD~1
+            for candidate in (f"origin/{base_branch}", base_branch, "HEAD~1"):
+                base_sha = self._resolve_commit(candidate)
+                if base_sha:
+                    break
+            else:
+                # Very first commit - no changes to analyze
+                return []
+
+            head_sha = self._resolve_commit("HEAD")
+            if not head_sha:
+                return []
+
+            # <base>...HEAD compares HEAD against the merge base. Shallow
+            # clones and unrelated histories have none; diff against the base
+            # itself then, as a plain <base> HEAD diff would
+            base_commit = self._merge_base(base_sha, head_sha) or base_sha
+            merge_base = base_commit.encode("ascii")
+
+            # Ask git for statuses and line counts directly; no patch text is
+            # generated or decoded. diff-tree runs as a long-lived --stdin
+            # process: "<head> <merge base>" diffs HEAD against that commit,
+            # --always prints the "<head>\0" header even for an empty diff,
+            # and the sentinel line is echoed back after the response. The
+            # path filter goes to git as a pathspec so numstat only reads
+            # blobs under it.
+            diff_tree_args = [
+                "diff-tree",
+                "--stdin",
+                "--always",
+                "-z",
+                "-r",
+                "--raw",
+                "--numstat",
+                "-M" if find_renames else "--no-renames",
+            ]
+            if path_filter:
+                diff_tree_args += ["--", f":(literal){path_filter}"]
+            diff_tree = self._batch_process(*diff_tree_args)
+            response = diff_tree.request(
+                f"{head_sha} ".encode("ascii")
+                + merge_base
+                + b"\n"
+                + _DIFF_TREE_SENTINEL,
+                _DIFF_TREE_SENTINEL,
+            )
+            # A commit git cannot read produces no header, only the sentinel
+            header = f"{head_sha}\0".encode("ascii")
+            if not response.startswith(header):
+                raise ArchyGitError(f"git diff-tree returned no diff for {head_sha}")
+            output = response[len(header) : -len(_DIFF_TREE_SENTINEL)]
 
-                # Apply path filter if specified
-                if path_filter and not str(file_path).startswith(path_filter):
+            changes = []
+            for (
+                status,
+                file_path,
+                old_path,
+                lines_added,
+                lines_removed,
+            ) in _parse_raw_numstat(output):
+                # Skip excluded files before doing any more work on them
+                if excluded_re and excluded_re.search(file_path):
                     continue
 
-                # Determine change type
-                if item.new_file:
-                    change_type = ChangeType.ADDED
-                elif item.deleted_file:
-                    change_type = ChangeType.DELETED
-                elif item.renamed_file:
-                    change_type = ChangeType.RENAMED
-                else:
-                    change_type = ChangeType.MODIFIED
-
-                # Calculate line changes (simplified)
-                lines_added = 0
-                lines_removed = 0
-                try:
-                    if item.diff:
-                        if isinstance(item.diff, bytes):
-                            diff_text = item.diff.decode("utf-8", errors="ignore")
-                        else:
-                            diff_text = str(item.diff)
-                        for line in diff_text.split("\n"):
-                            if line.startswith("+") and not line.startswith("+++"):
-                                lines_added += 1
-                            elif line.startswith("-") and not line.startswith("---"):
-                                lines_removed += 1
-                except Exception:
-                    # If we can't decode diff, just mark as having changes
-                    lines_added = 1
-
-                change = GitChange(
-                    file_path=file_path,
-                    change_type=change_type,
-                    lines_added=lines_added,
-                    lines_removed=lines_removed,
-                    old_path=(
-                        Path(item.a_path) if item.renamed_file and item.a_path else None
-                    ),
+                changes.append(
+                    GitChange(
+                        file_path=file_path,
+                        change_type=_STATUS_CHANGE_TYPES.get(
+                            status, ChangeType.MODIFIED
+                        ),
+                        lines_added=lines_added,
+                        lines_removed=lines_removed,
+                        old_path=old_path,
+                        base_sha=base_commit,
+                        head_sha=head_sha,
+                        git_root=self.git_root,
+                    )
                 )
-                changes.append(change)
 
             return changes
 
         except Exception as e:
             raise ArchyGitError(f"Failed to get changed files: {e}") from e
 
-    def get_all_tracked_files(self, path_filter: Optional[str] = None) -> list[Path]:
+    def get_all_tracked_files(
+        self,
+        path_filter: Optional[str] = None,
+        excluded_re: Optional[re.Pattern[str]] = None,
+    ) -> list[str]:
         """
         Get all tracked files in the repository.
 
+        Files matching excluded_re are dropped while the list is built.
+
         Replaces bash: git ls-files
         """
         try:
-            # Get all tracked files
-            tracked_files = []
-
-            for item in self.repo.git.ls_files().split("\n"):
-                if not item.strip():
+            # One ls-files call lists the index (--cached) and the entries
+            # deleted from the working tree (--deleted) from a single index
+            # read. git documents -t as semi-deprecated, but it is the only
+            # way to tell the two sets apart within one listing: deleted
+            # entries are tagged "R", skip-worktree entries "S".
+            output = self._run_git("ls-files", "-z", "-t", "--cached", "--deleted")
+
+            listed: dict[str, None] = {}
+            deleted_files: set[str] = set()
+            for entry in output.decode("utf-8", "surrogateescape").split("\0"):
+                if not entry:
                     continue
+                tag, file_path = entry[0], entry[2:]
+                if tag == "R":
+                    deleted_files.add(file_path)
+                elif tag == "S" and not (self.git_root / file_path).exists():
+                    # Skip-worktree (e.g. sparse checkout) entries are never
+                    # reported by --deleted, so check the few of them directly
+                    deleted_files.add(file_path)
+                else:
+                    # Unmerged paths are listed once per stage; keep the first
+                    listed[file_path] = None
 
-                file_path = Path(item.strip())
-
+            tracked_files = []
+            for file_path in listed:
                 # Apply path filter if specified
-                if path_filter and not str(file_path).startswith(path_filter):
+                if path_filter and not file_path.startswith(path_filter):
+                    continue
+
+                if excluded_re and excluded_re.search(file_path):
                     continue
 
-                # Check if file actually exists (might be deleted but still tracked)
-                full_path = self.git_root / file_path
-                if full_path.exists():
+                if file_path not in deleted_files:
                     tracked_files.append(file_path)
 
             return tracked_files
@@ -321,48 +949,36 @@ class GitRepository:
             raise ArchyGitError(f"Failed to get tracked files: {e}") from e
 
     def filter_excluded_patterns(
-        self, files: list[Path], excluded_patterns: list[str]
-    ) -> list[Path]:
+        self, files: list[str], excluded_patterns: list[str]
+    ) -> list[str]:
         """
         Filter out files matching excluded patterns.
 
         Replaces bash pattern filtering logic.
         """
-        filtered = []
-
-        for file_path in files:
-            file_str = str(file_path)
-            should_exclude = False
+        excluded_re = compile_excluded_patterns(excluded_patterns)
+        if not excluded_re:
+            return list(files)
 
-            for pattern in excluded_patterns:
-                # Simple pattern matching - could be enhanced with fnmatch
-                if pattern in file_str:
-                    should_exclude = True
-                    break
-
-            if not should_exclude:
-                filtered.append(file_path)
-
-        return filtered
+        return [file_path for file_path in files if not excluded_re.search(file_path)]
 
     def analyze_repository(
         self,
         path_filter: Optional[str] = None,
         excluded_patterns: Optional[list[str]] = None,
+        find_renames: bool = False,
     ) -> GitAnalysis:
         """
         Perform complete git analysis for architecture generation.
 
         Combines all git operations needed for both fresh and update modes.
+        find_renames is passed through to get_changed_files.
         """
-        if excluded_patterns is None:
-            excluded_patterns = []
-
         # In dry-run mode, return mock git analysis
         if self.dry_run:
             return GitAnalysis(
                 changed_files=[],
-                all_tracked_files=[self.path / "mock_file.py"],
+                all_tracked_files=[str(self.path / "mock_file.py")],
                 default_branch="main",
                 current_branch="main",
                 git_root=self._git_root or self.path,
@@ -375,31 +991,25 @@ class GitRepository:
             default_branch = self.get_default_branch()
             current_branch = self.get_current_branch()
 
-            # Get changed files for update mode
-            changed_files = self.get_changed_files(default_branch, path_filter)
+            # Compile excluded patterns once; both listings filter inline
+            excluded_re = compile_excluded_patterns(excluded_patterns or [])
 
-            # Filter excluded patterns from changes
-            filtered_changes = []
-            for change in changed_files:
-                if not any(
-                    pattern in str(change.file_path) for pattern in excluded_patterns
-                ):
-                    filtered_changes.append(change)
+            # Get changed files for update mode
+            changed_files = self.get_changed_files(
+                default_branch, path_filter, excluded_re, find_renames
+            )
 
             # Get all tracked files for fresh mode
-            all_tracked = self.get_all_tracked_files(path_filter)
-            all_tracked_filtered = self.filter_excluded_patterns(
-                all_tracked, excluded_patterns
-            )
+            all_tracked = self.get_all_tracked_files(path_filter, excluded_re)
 
             return GitAnalysis(
-                changed_files=filtered_changes,
-                all_tracked_files=all_tracked_filtered,
+                changed_files=changed_files,
+                all_tracked_files=all_tracked,
                 default_branch=default_branch,
                 current_branch=current_branch,
                 git_root=self.git_root,
-                total_changes=len(filtered_changes),
-                has_changes=len(filtered_changes) > 0,
+                total_changes=len(changed_files),
+                has_changes=len(changed_files) > 0,
             )
 
         except Exception as e:
@@ -471,7 +1081,9 @@ class GitRepository:
                     total_changes=len(mock_changes),
                     summary=f"Mock {repo.split('/')[-1]} PR#{number}: {description} ({len(mock_changes)} files)",
                     description=description,
-                    raw_diff=f"# Mock diff content for {repo}#{number}\ndiff --git a/src/api.py b/src/api.py\n+# Mock changes for {repo}",
+                    compressed_diff=zlib.compress(
+                        f"# Mock diff content for {repo}#{number}\ndiff --git a/src/api.py b/src/api.py\n+# Mock changes for {repo}".encode()
+                    ),
                 )
                 pr_diffs.append(pr_diff)
                 total_changes += len(mock_changes)
@@ -502,17 +1114,26 @@ class GitRepository:
             )
 
         pr_diffs = []
-        excluded_patterns = self._get_excluded_file_patterns()
 
-        for pr_spec in pr_specs:
+        # Fetching is network-bound, so run all fetches concurrently; results
+        # are collected in input order and parsed here on the calling thread
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(_MAX_PR_FETCH_WORKERS, len(pr_specs)))
+        ) as executor:
+            fetches = [
+                executor.submit(self._fetch_pr_diff, pr_spec["repo"], pr_spec["number"])
+                for pr_spec in pr_specs
+            ]
+
+        for pr_spec, fetch in zip(pr_specs, fetches):
             repo = pr_spec["repo"]
             number = pr_spec["number"]
             description = pr_spec.get("description", "")
             focus_areas = pr_spec.get("focus_areas", [])
 
             try:
-                # Fetch PR diff using gh CLI
-                diff_content = self._fetch_pr_diff(repo, number)
+                # Collect the fetched diff (re-raises any fetch error)
+                diff_content = fetch.result()
 
                 # Parse the diff into structured data
                 pr_diff = self._parse_pr_diff(
@@ -521,7 +1142,6 @@ class GitRepository:
                     number,
                     description,
                     focus_areas,
-                    excluded_patterns,
                 )
                 pr_diffs.append(pr_diff)
             except ArchyGitError as e:
@@ -534,7 +1154,6 @@ class GitRepository:
                     summary=f"Failed to fetch PR: {e}",
                     description=description,
                     focus_areas=focus_areas,
-                    raw_diff="",
                 )
                 pr_diffs.append(pr_diff)
 
@@ -590,88 +1209,224 @@ class GitRepository:
             r".*/mocks/.*\.json$",
         ]
 
-    def _fetch_pr_diff(self, repo: str, pr_number: int) -> str:
-        """Fetch PR diff using GitHub CLI."""
+    def _fetch_pr_diff(self, repo: str, pr_number: int) -> bytes:
+        """
+        Fetch PR diff, reusing a cached copy while the PR head is unchanged.
+
+        Diffs are stored gzip-compressed under the archy cache directory,
+        keyed by repository, PR number and head commit sha.
+        """
+        cache_dir = _cache_dir()
+        if cache_dir is None:
+            return self._download_pr_diff(repo, pr_number)
+
+        head_sha = self._fetch_pr_head_sha(repo, pr_number)
+        if not head_sha:
+            return self._download_pr_diff(repo, pr_number)
+
+        repo_digest = hashlib.sha1(repo.encode("utf-8")).hexdigest()[:16]
+        cache_file = (
+            cache_dir / "pr-diffs" / repo_digest / f"{pr_number}-{head_sha}.diff.gz"
+        )
         try:
-            cmd = ["gh", "pr", "diff", str(pr_number), "-R", repo]
+            return gzip.decompress(cache_file.read_bytes())
+        except (OSError, EOFError, zlib.error):
+            pass  # Missing or corrupt cache entry; download it again
+
+        diff_content = self._download_pr_diff(repo, pr_number)
+        _write_cache_file(cache_file, gzip.compress(diff_content, compresslevel=3))
+
+        # Drop diffs cached for earlier heads of this PR
+        for stale_file in cache_file.parent.glob(f"{pr_number}-*.diff.gz"):
+            if stale_file != cache_file:
+                stale_file.unlink(missing_ok=True)
+        return diff_content
+
+    def _fetch_pr_head_sha(self, repo: str, pr_number: int) -> Optional[str]:
+        """Get the PR's head commit sha, or None if it cannot be determined."""
+        token = _github_token()
+        try:
+            if token:
+                body = self._github_api_get(
+                    repo, pr_number, "application/vnd.github+json", token
+                )
+                return str(json.loads(body)["head"]["sha"])
+
             result = subprocess.run(
-                cmd,
+                ["gh", "pr", "view", str(pr_number), "-R", repo]
+                + ["--json", "headRefOid", "--jq", ".headRefOid"],
                 capture_output=True,
                 text=True,
                 check=True,
-                timeout=30,  # 30 second timeout
+                timeout=30,
             )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
+            return result.stdout.strip() or None
+        except (ArchyGitError, ValueError, KeyError, TypeError):
+            return None
+        except (subprocess.SubprocessError, FileNotFoundError):
+            return None  # gh missing or failed; fetch without the cache
+
+    def _download_pr_diff(self, repo: str, pr_number: int) -> bytes:
+        """
+        Download PR diff from the GitHub REST API.
+
+        Uses GH_TOKEN or GITHUB_TOKEN and asks for a gzip-encoded diff. Falls
+        back to the GitHub CLI when no token is set.
+        """
+        token = _github_token()
+        if not token:
+            return self._fetch_pr_diff_gh(repo, pr_number)
+
+        return self._github_api_get(
+            repo, pr_number, "application/vnd.github.v3.diff", token
+        )
+
+    def _github_api_get(
+        self, repo: str, pr_number: int, accept: str, token: str
+    ) -> bytes:
+        """GET a pull request from the GitHub REST API in the given media type."""
+        request = urllib.request.Request(
+            f"{_GITHUB_API_URL}/repos/{repo}/pulls/{pr_number}",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": accept,
+                "Accept-Encoding": "gzip",
+                "User-Agent": "archy",
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body: bytes = response.read()
+                if response.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+        except urllib.error.HTTPError as e:
             raise ArchyGitError(
-                f"Failed to fetch PR {repo}#{pr_number}: {e.stderr}"
+                f"Failed to fetch PR {repo}#{pr_number}: HTTP {e.code} {e.reason}"
             ) from e
-        except subprocess.TimeoutExpired as e:
-            raise ArchyGitError(f"Timeout fetching PR {repo}#{pr_number}") from e
+        except (OSError, EOFError, zlib.error, http.client.HTTPException) as e:
+            # HTTPException covers truncated bodies (IncompleteRead); zlib.error
+            # a corrupt gzip body
+            raise ArchyGitError(f"Failed to fetch PR {repo}#{pr_number}: {e}") from e
+
+    def _fetch_pr_diff_gh(self, repo: str, pr_number: int) -> bytes:
+        """Fetch PR diff using GitHub CLI."""
+        cmd = ["gh", "pr", "diff", str(pr_number), "-R", repo]
+        try:
+            # Raw byte pipes: no text wrapper, newline translation or decode
+            # while gh streams a large diff
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
         except FileNotFoundError as e:
             raise ArchyGitError("GitHub CLI (gh) not found. Please install it.") from e
 
+        try:
+            stdout, stderr = process.communicate(timeout=30)  # 30 second timeout
+        except subprocess.TimeoutExpired as e:
+            process.kill()
+            process.communicate()
+            raise ArchyGitError(f"Timeout fetching PR {repo}#{pr_number}") from e
+
+        if process.returncode:
+            raise ArchyGitError(
+                f"Failed to fetch PR {repo}#{pr_number}: "
+                f"{stderr.decode('utf-8', errors='replace')}"
+            )
+        return stdout
+
     def _parse_pr_diff(
         self,
-        diff_content: str,
+        diff_content: bytes,
         repo: str,
         number: int,
         description: str,
         focus_areas: list[str],
-        excluded_patterns: list[str],
     ) -> PRDiff:
-        """Parse git diff output into structured PRChange objects."""
-        changes = []
+        """
+        Parse git diff output into structured PRChange objects.
 
-        # Split diff by file changes (each starts with "diff --git")
-        file_diffs = re.split(r"^diff --git", diff_content, flags=re.MULTILINE)
+        The diff is scanned as bytes; only file paths are decoded.
+        """
+        changes = []
 
-        for file_diff in file_diffs[1:]:  # Skip first empty split
-            if not file_diff.strip():
-                continue
+        # Single pass over the diff: per-file state is flushed into a PRChange
+        # whenever the next "diff --git" header (or the end) is reached. Paths
+        # stay bytes until then; the header's paths are replaced by the
+        # unambiguous "rename to"/"+++ b/" lines when those are present.
+        file_path: Optional[bytes] = None
+        old_path: Optional[bytes] = None
+        change_type: Optional[str] = None  # Set by new/deleted/rename lines
+        lines_added = lines_removed = 0
+        in_hunk = False
+
+        def flush() -> None:
+            if file_path is None:
+                return
+            path = file_path.decode("utf-8", errors="replace")
 
-            # Extract file paths
-            file_match = re.match(r" a/(.*?) b/(.*?)$", file_diff.split("\n")[0])
-            if not file_match:
-                continue
+            # Skip excluded files
+            if self._should_exclude_file(path):
+                return
 
-            file_path = file_match.group(2)  # Use the "after" path
-            old_path = (
-                file_match.group(1)
-                if file_match.group(1) != file_match.group(2)
+            renamed_from = (
+                old_path.decode("utf-8", errors="replace")
+                if old_path is not None and old_path != file_path
                 else None
             )
-
-            # Skip excluded files
-            if self._should_exclude_file(file_path, excluded_patterns):
-                continue
-
-            # Determine change type
-            if file_diff.startswith(" /dev/null"):
-                change_type = "Added"
-            elif "/dev/null b/" in file_diff.split("\n")[0]:
-                change_type = "Deleted"
-            elif old_path:
-                change_type = "Renamed"
-            else:
-                change_type = "Modified"
-
-            # Count lines added/removed
-            lines_added = len(re.findall(r"^\+[^+]", file_diff, re.MULTILINE))
-            lines_removed = len(re.findall(r"^-[^-]", file_diff, re.MULTILINE))
-
             changes.append(
                 PRChange(
-                    file_path=file_path,
-                    change_type=change_type,
+                    file_path=path,
+                    change_type=change_type
+                    or ("Renamed" if renamed_from else "Modified"),
                     lines_added=lines_added,
                     lines_removed=lines_removed,
                     pr_number=number,
                     repo=repo,
-                    old_path=Path(old_path) if old_path else None,
+                    old_path=renamed_from,
                 )
             )
 
+        for line in diff_content.splitlines():
+            if line.startswith(b"diff --git "):
+                flush()
+
+                # Start a new file; a header that cannot be parsed leaves no
+                # path, so its lines are not counted against the previous file
+                old_path, file_path = _split_diff_header(
+                    line[len(b"diff --git ") :]
+                ) or (None, None)
+                change_type = None
+                lines_added = lines_removed = 0
+                in_hunk = False
+            elif in_hunk:
+                # Count lines added/removed
+                first = line[:1]
+                if first == b"+":
+                    lines_added += 1
+                elif first == b"-":
+                    lines_removed += 1
+            elif line.startswith(b"@@"):
+                in_hunk = True
+            elif line.startswith(b"+++ "):
+                # Git appends a tab to names containing spaces; deletions
+                # have /dev/null here and keep the header's path
+                new_path = _unquote_git_path(line[4:].rstrip(b"\t"))
+                if new_path.startswith(b"b/"):
+                    file_path = new_path[2:]
+            elif line.startswith(b"rename from "):
+                old_path = _unquote_git_path(line[len(b"rename from ") :])
+            elif line.startswith(b"rename to "):
+                file_path = _unquote_git_path(line[len(b"rename to ") :])
+            elif line.startswith(b"new file mode"):
+                change_type = "Added"
+            elif line.startswith(b"deleted file mode"):
+                change_type = "Deleted"
+
+        flush()
+
         service_name = repo.split("/")[-1]  # Extract service name from repo
         summary = f"Changes in {service_name}: {len(changes)} files modified"
         if description:
@@ -685,86 +1440,95 @@ class GitRepository:
             summary=summary,
             description=description,
             focus_areas=focus_areas,
-            raw_diff=diff_content,  # Store the full diff content
+            # Store the full diff content compressed; it is only decoded when
+            # the prompt is built
+            compressed_diff=zlib.compress(diff_content, 1),
+        )
+
+    @cached_property
+    def _excluded_re(self) -> re.Pattern[str]:
+        """All excluded file patterns compiled into a single alternation."""
+        return re.compile(
+            "|".join(
+                f"(?:{pattern})" for pattern in self._get_excluded_file_patterns()
+            ),
+            re.IGNORECASE,
+        )
+
+    @cached_property
+    def _excluded_hs_db(self) -> Any:
+        """
+        Excluded file patterns compiled into a Hyperscan database.
+
+        None when hyperscan is not installed. Patterns are anchored with "^"
+        to keep the start-anchored semantics of re.match.
+        """
+        if hyperscan is None:
+            return None
+
+        patterns = self._get_excluded_file_patterns()
+        database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        database.compile(
+            expressions=[f"^(?:{pattern})".encode() for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH]
+            * len(patterns),
         )
+        return database
 
-    def _should_exclude_file(
-        self, file_path: str, excluded_patterns: list[str]
-    ) -> bool:
+    def _should_exclude_file(self, file_path: str) -> bool:
         """Check if file should be excluded from architectural analysis."""
-        for pattern in excluded_patterns:
-            if re.match(pattern, file_path, re.IGNORECASE):
-                return True
-        return False
+        database = self._excluded_hs_db
+        if database is None:
+            return self._excluded_re.match(file_path) is not None
+
+        matched = False
+
+        def on_match(*_: Any) -> None:
+            nonlocal matched
+            matched = True
+
+        database.scan(
+            file_path.encode("utf-8", "surrogateescape"),
+            match_event_handler=on_match,
+        )
+        return matched
 
     def _detect_cross_service_patterns(
         self, pr_diffs: list[PRDiff]
     ) -> dict[str, list[str]]:
         """Detect API calls, shared DBs, events across services."""
-        patterns = {}
-
-        # Look for API endpoints, database changes, etc.
-        api_endpoints = []
-        api_specifications = []
-        database_changes = []
-        config_changes = []
+        # Look for API endpoints, database changes, etc. Categories are listed
+        # in priority order, which is also the order they are reported in.
+        categorized: dict[str, list[str]] = {
+            "api_specifications": [],
+            "api_endpoints": [],
+            "database_changes": [],
+            "config_changes": [],
+        }
 
         for pr_diff in pr_diffs:
             service_name = pr_diff.service_name
 
             for change in pr_diff.changes:
-                file_path = change.file_path.lower()
+                category = _classify_path(change.file_path_lower)
+                if not category:
+                    continue
 
-                # API Specifications (HIGH PRIORITY for distributed systems)
-                if (
-                    any(
-                        keyword in file_path
-                        for keyword in ["swagger", "openapi", "api-docs"]
-                    )
-                    or file_path.endswith(".json")
-                    and "api" in file_path
-                ):
+                if category == "api_specifications":
                     lines_info = (
                         f"(+{change.lines_added}/-{change.lines_removed})"
                         if change.lines_added or change.lines_removed
                         else ""
                     )
-                    api_specifications.append(
+                    categorized[category].append(
                         f"{service_name}: {change.file_path} {lines_info}"
                     )
+                else:
+                    categorized[category].append(f"{service_name}: {change.file_path}")
 
-                # API endpoints and routes
-                elif any(
-                    keyword in file_path
-                    for keyword in ["api", "router", "controller", "endpoint", "route"]
-                ):
-                    api_endpoints.append(f"{service_name}: {change.file_path}")
-
-                # Database changes
-                elif any(
-                    keyword in file_path
-                    for keyword in ["model", "schema", "migration", "db", "sql"]
-                ):
-                    database_changes.append(f"{service_name}: {change.file_path}")
-
-                # Config changes
-                elif any(
-                    keyword in file_path
-                    for keyword in ["config", "env", "setting", "constant"]
-                ):
-                    config_changes.append(f"{service_name}: {change.file_path}")
-
-        # Prioritize API specifications first (most important for distributed systems)
-        if api_specifications:
-            patterns["api_specifications"] = api_specifications
-        if api_endpoints:
-            patterns["api_endpoints"] = api_endpoints
-        if database_changes:
-            patterns["database_changes"] = database_changes
-        if config_changes:
-            patterns["config_changes"] = config_changes
-
-        return patterns
+        return {category: found for category, found in categorized.items() if found}
 
     def _detect_service_interactions(
         self, pr_diffs: list[PRDiff]
@@ -772,25 +1536,39 @@ class GitRepository:
         """Detect service-to-service interactions from code changes."""
         interactions = {}
 
+        service_names = list(
+            dict.fromkeys(pr_diff.service_name for pr_diff in pr_diffs)
+        )
+        service_names_lower = {name: name.lower() for name in service_names}
+
         for pr_diff in pr_diffs:
             service_name = pr_diff.service_name
             service_interactions = {}
 
+            # One streaming pass over this PR's diff finds every other service
+            # it mentions
+            mentioned = pr_diff.mentioned_names(
+                service_names_lower[other_service]
+                for other_service in service_names
+                if other_service != service_name
+            )
+
             # Analyze diff content for service calls
-            for other_pr in pr_diffs:
-                if other_pr.service_name == service_name:
+            for other_service in service_names:
+                if other_service == service_name:
                     continue
 
-                other_service = other_pr.service_name
-                calls = []
+                other_service_lower = service_names_lower[other_service]
 
                 # Look for references to other services in the diff
-                for change in pr_diff.changes:
-                    if other_service.lower() in change.file_path.lower():
-                        calls.append(f"File reference: {change.file_path}")
+                calls = [
+                    f"File reference: {change.file_path}"
+                    for change in pr_diff.changes
+                    if other_service_lower in change.file_path_lower
+                ]
 
                 # Look in raw diff content for API calls, imports, etc.
-                if other_service.lower() in pr_diff.raw_diff.lower():
+                if other_service_lower in mentioned:
                     calls.append(f"Code references to {other_service}")
 
                 if calls:
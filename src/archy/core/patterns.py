@@ -5,11 +5,22 @@ This module handles loading and processing the architecture analysis patterns
 that are used to instruct AI backends on how to generate documentation.
 """
 
+import os
+from functools import cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 from ..exceptions import ArchyError
 
+# Default patterns directory at the repository root (src/archy/core -> ../../..)
+_DEFAULT_PATTERNS_DIR = (
+    Path(__file__).resolve().parent.parent.parent.parent / "patterns"
+)
+
+# Separates an extension pattern from the built-in pattern it extends
+_BASE_HEADER = "\n\n# BASE PATTERN FOLLOWS\n\n"
+
 
 class PatternManager:
     """
@@ -19,6 +30,11 @@ class PatternManager:
     analyze codebases and generate architecture documentation.
     """
 
+    # Directories whose patterns were already read into _read_pattern's
+    # cache, which is shared by all instances so a new manager (e.g. for
+    # another extension pattern) does not re-read the built-in patterns
+    _preloaded_dirs: ClassVar[set[Path]] = set()
+
     def __init__(
         self,
         patterns_dir: Optional[Path] = None,
@@ -27,13 +43,55 @@ class PatternManager:
         """Initialize pattern manager with patterns directory and optional extension pattern."""
         if patterns_dir is None:
             # Default to patterns directory relative to script location
-            current_dir = Path(__file__).parent
-            self.patterns_dir = current_dir.parent.parent.parent / "patterns"
+            self.patterns_dir = _DEFAULT_PATTERNS_DIR
         else:
             self.patterns_dir = patterns_dir
 
         self.extend_pattern_path = extend_pattern_path
-        self._pattern_cache: dict[str, str] = {}
+        # Extension pattern plus base header, read once and prepended to
+        # each built-in pattern; None when there is no (non-empty) extension
+        self._extension_prefix = self._load_extension_prefix()
+        self._preload_patterns()
+
+    def _preload_patterns(self) -> None:
+        """
+        Read every pattern file into the cache in one directory scan.
+
+        The patterns directory holds a small fixed set of files, so loading
+        them up front saves a stat and open per pattern later. A missing or
+        unreadable directory is skipped; load_pattern then reports errors.
+        """
+        if self.patterns_dir in self._preloaded_dirs:
+            return
+
+        try:
+            with os.scandir(self.patterns_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".md") or not entry.is_file():
+                        continue
+                    try:
+                        self._read_pattern(self.patterns_dir, entry.name[:-3])
+                    except ArchyError:
+                        continue  # Not cached; load_pattern reports it
+        except OSError:
+            return
+
+        self._preloaded_dirs.add(self.patterns_dir)
+
+    @staticmethod
+    @cache
+    def _read_pattern(patterns_dir: Path, pattern_name: str) -> str:
+        """Read a pattern file, caching its content per directory and name."""
+        pattern_file = patterns_dir / f"{pattern_name}.md"
+
+        # Read directly and map failures; an exists() check first would
+        # cost a second stat and leave a window for the file to change
+        try:
+            return pattern_file.read_text(encoding="utf-8")
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise ArchyError(f"Pattern file not found: {pattern_file}") from e
+        except Exception as e:
+            raise ArchyError(f"Failed to load pattern {pattern_name}: {e}") from e
 
     def load_pattern(self, pattern_name: str) -> str:
         """
@@ -48,83 +106,50 @@ class PatternManager:
         Raises:
             ArchyError: If pattern file not found or cannot be read
         """
-        # Check cache first
-        if pattern_name in self._pattern_cache:
-            return self._pattern_cache[pattern_name]
+        return self._read_pattern(self.patterns_dir, pattern_name)
 
-        pattern_file = self.patterns_dir / f"{pattern_name}.md"
-
-        if not pattern_file.exists():
-            raise ArchyError(f"Pattern file not found: {pattern_file}")
-
-        try:
-            with open(pattern_file, encoding="utf-8") as f:
-                content = f.read()
-
-            # Cache the pattern
-            self._pattern_cache[pattern_name] = content
-            return content
-
-        except Exception as e:
-            raise ArchyError(f"Failed to load pattern {pattern_name}: {e}") from e
-
-    def _load_extension_pattern(self) -> Optional[str]:
-        """Load extension pattern file if provided."""
+    def _load_extension_prefix(self) -> Optional[str]:
+        """Load extension pattern file if provided and build its prefix."""
         if not self.extend_pattern_path:
             return None
 
         try:
-            with open(self.extend_pattern_path, encoding="utf-8") as f:
-                return f.read().strip()
+            extension_pattern = self.extend_pattern_path.read_text(
+                encoding="utf-8"
+            ).strip()
         except Exception as e:
             raise ArchyError(
                 f"Failed to load extension pattern {self.extend_pattern_path}: {e}"
             ) from e
 
-    def get_create_pattern(self) -> str:
-        """Get the pattern for creating fresh architecture documentation."""
-        built_in_pattern = self.load_pattern("create_design_document_pattern")
-        extension_pattern = self._load_extension_pattern()
-
-        if extension_pattern:
-            # Prepend extension pattern to built-in pattern
-            return (
-                f"{extension_pattern}\n\n# BASE PATTERN FOLLOWS\n\n{built_in_pattern}"
-            )
+        if not extension_pattern:
+            return None
+        return extension_pattern + _BASE_HEADER
 
+    def _get_assembled_pattern(self, pattern_name: str) -> str:
+        """Get a built-in pattern with the extension pattern prepended, if any."""
+        built_in_pattern = self.load_pattern(pattern_name)
+        if self._extension_prefix:
+            return self._extension_prefix + built_in_pattern
         return built_in_pattern
 
+    def get_create_pattern(self) -> str:
+        """Get the pattern for creating fresh architecture documentation."""
+        return self._get_assembled_pattern("create_design_document_pattern")
+
     def get_update_pattern(self) -> str:
         """Get the pattern for updating existing architecture documentation."""
-        built_in_pattern = self.load_pattern("update_arch_diagram_pattern")
-        extension_pattern = self._load_extension_pattern()
-
-        if extension_pattern:
-            # Prepend extension pattern to built-in pattern
-            return (
-                f"{extension_pattern}\n\n# BASE PATTERN FOLLOWS\n\n{built_in_pattern}"
-            )
-
-        return built_in_pattern
+        return self._get_assembled_pattern("update_arch_diagram_pattern")
 
     def get_distributed_pattern(self) -> str:
         """Get the pattern for distributed system analysis."""
-        built_in_pattern = self.load_pattern("analyze_distributed_system_pattern")
-        extension_pattern = self._load_extension_pattern()
-
-        if extension_pattern:
-            # Prepend extension pattern to built-in pattern
-            return (
-                f"{extension_pattern}\n\n# BASE PATTERN FOLLOWS\n\n{built_in_pattern}"
-            )
-
-        return built_in_pattern
+        return self._get_assembled_pattern("analyze_distributed_system_pattern")
 
     def create_fresh_prompt(
         self,
         project_name: str,
         analysis_target: Path,
-        tracked_files: list[Path],
+        tracked_files: list[str],
         directory_structure: str,
         git_info: dict[str, Any],
     ) -> str:
@@ -135,27 +160,34 @@ class PatternManager:
         the actual codebase information that the AI should analyze.
         """
         pattern = self.get_create_pattern()
-
-        # Build the actual codebase input as specified by the pattern's "# INPUT:" section
-        codebase_input = f"""
-Project Name: {project_name}
-Analysis Target: {analysis_target}
-Git Repository: {git_info.get("git_root", "Unknown")}
-Current Branch: {git_info.get("current_branch", "Unknown")}
-Default Branch: {git_info.get("default_branch", "main")}
-
-Directory Structure:
-```
-{directory_structure}
-```
-
-Files to Analyze ({len(tracked_files)} total):
-{chr(10).join(f"- {file}" for file in tracked_files[:50])}
-{"..." if len(tracked_files) > 50 else ""}
-"""
-
-        # The pattern ends with "# INPUT:" - append our actual codebase data
-        return f"{pattern}\n{codebase_input}"
+        file_count = len(tracked_files)
+        git_root = git_info.get("git_root", "Unknown")
+        current_branch = git_info.get("current_branch", "Unknown")
+        default_branch = git_info.get("default_branch", "main")
+
+        # Build the actual codebase input as specified by the pattern's "# INPUT:"
+        # section. The pattern ends with "# INPUT:" - our codebase data follows
+        # it, assembled as lines and joined once.
+        parts = [
+            pattern,
+            "",
+            f"Project Name: {project_name}",
+            f"Analysis Target: {analysis_target}",
+            f"Git Repository: {git_root}",
+            f"Current Branch: {current_branch}",
+            f"Default Branch: {default_branch}",
+            "",
+            "Directory Structure:",
+            "```",
+            directory_structure,
+            "```",
+            "",
+            f"Files to Analyze ({file_count} total):",
+            "\n".join(f"- {file}" for file in islice(tracked_files, 50)),
+            "..." if file_count > 50 else "",
+            "",
+        ]
+        return "\n".join(parts)
 
     def create_update_prompt(
         self, existing_doc: str, changes_summary: str, git_info: dict[str, Any]
@@ -167,26 +199,31 @@ Files to Analyze ({len(tracked_files)} total):
         the actual input data as specified by the pattern.
         """
         pattern = self.get_update_pattern()
+        current_branch = git_info.get("current_branch", "Unknown")
+        default_branch = git_info.get("default_branch", "main")
+        git_root = git_info.get("git_root", "Unknown")
 
         # Build the input as specified by the pattern's "# INPUT:" section
         # The pattern expects: 1. DESIGN DOCUMENT, 2. CODE CHANGES
-        input_data = f"""
-DESIGN DOCUMENT:
-
-{existing_doc}
-
-CODE CHANGES:
-
-Git Information:
-- Current Branch: {git_info.get("current_branch", "Unknown")}
-- Default Branch: {git_info.get("default_branch", "main")}
-- Git Repository: {git_info.get("git_root", "Unknown")}
-
-{changes_summary}
-"""
-
-        # The pattern ends with "# INPUT:" - append our actual data
-        return f"{pattern}\n{input_data}"
+        # The pattern ends with "# INPUT:" - our actual data follows it
+        parts = [
+            pattern,
+            "",
+            "DESIGN DOCUMENT:",
+            "",
+            existing_doc,
+            "",
+            "CODE CHANGES:",
+            "",
+            "Git Information:",
+            f"- Current Branch: {current_branch}",
+            f"- Default Branch: {default_branch}",
+            f"- Git Repository: {git_root}",
+            "",
+            changes_summary,
+            "",
+        ]
+        return "\n".join(parts)
 
     def create_distributed_prompt(self, multi_pr_analysis: Any) -> str:
         """
@@ -235,9 +272,11 @@ Git Information:
             if len(pr_diff.changes) > 10:
                 input_data += f"... and {len(pr_diff.changes) - 10} more files\n"
 
-            # Add the actual PR diff content for AI analysis
-            if pr_diff.raw_diff.strip():
-                input_data += f"\n**Full PR Diff**:\n```diff\n{pr_diff.raw_diff}\n```\n"
+            # Add the actual PR diff content for AI analysis; raw_diff
+            # decompresses on every access, so read it once
+            raw_diff = pr_diff.raw_diff
+            if raw_diff.strip():
+                input_data += f"\n**Full PR Diff**:\n```diff\n{raw_diff}\n```\n"
 
         # Add cross-service patterns
         if multi_pr_analysis.cross_service_patterns:
@@ -293,5 +332,14 @@ def get_pattern_manager(extend_pattern_path: Optional[Path] = None) -> PatternMa
     return _pattern_manager_instance
 
 
-# For backward compatibility
-pattern_manager = get_pattern_manager()
+def __getattr__(name: str) -> PatternManager:
+    """
+    Create the backward-compatible ``pattern_manager`` on first access.
+
+    Keeps importing this module free of filesystem work (PEP 562).
+    """
+    if name == "pattern_manager":
+        manager = get_pattern_manager()
+        globals()["pattern_manager"] = manager
+        return manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,48 +11,56 @@ from typing import Optional
 class ArchyError(Exception):
     """Base exception for all Archy-related errors."""
 
+    # Keeps the fields off the lazily created instance __dict__; subclasses
+    # declare empty __slots__ so they do not bring one back
+    __slots__ = ("message", "details", "_str")
+
     def __init__(self, message: str, details: Optional[str] = None):
         self.message = message
         self.details = details
+        # Fields are set once, so format the message here rather than per str()
+        self._str = f"{message}: {details}" if details else message
         super().__init__(self.message)
 
     def __str__(self) -> str:
-        if self.details:
-            return f"{self.message}: {self.details}"
-        return self.message
+        return self._str
+
+    def __reduce__(self) -> tuple[type["ArchyError"], tuple[str, Optional[str]]]:
+        # BaseException's default only restores args and __dict__, not slots
+        return type(self), (self.message, self.details)
 
 
 class ArchyConfigError(ArchyError):
     """Raised when configuration is invalid or incomplete."""
 
-    pass
+    __slots__ = ()
 
 
 class ArchyGitError(ArchyError):
     """Raised when git operations fail or repository is invalid."""
 
-    pass
+    __slots__ = ()
 
 
 class ArchySecurityError(ArchyError):
     """Raised when security validation fails (path traversal, etc.)."""
 
-    pass
+    __slots__ = ()
 
 
 class ArchyAIBackendError(ArchyError):
     """Raised when AI backend operations fail."""
 
-    pass
+    __slots__ = ()
 
 
 class ArchyFileError(ArchyError):
     """Raised when file operations fail."""
 
-    pass
+    __slots__ = ()
 
 
 class ArchyValidationError(ArchyError):
     """Raised when input validation fails."""
 
-    pass
+    __slots__ = ()
@@ -12,73 +12,60 @@ from archy.cli import app
 runner = CliRunner()
 
 
-def test_cli_help():
-    """Test that help command works."""
-    result = runner.invoke(app, ["--help"])
-    assert result.exit_code == 0
-    assert "architecture documentation generator" in result.stdout
-
-
-def test_version_command():
-    """Test version command."""
-    result = runner.invoke(app, ["version"])
-    assert result.exit_code == 0
-    assert "Archy" in result.stdout
-
-
-def test_fresh_command_basic():
-    """Test fresh command with default arguments."""
-    result = runner.invoke(app, ["fresh", "--dry-run"])
-    assert result.exit_code == 0
-    assert "Creating" in result.stdout
-
-
-@pytest.mark.skip(
-    reason="Temporarily disabled - needs debugging of dry-run mode with specific flags"
+@pytest.mark.parametrize(
+    "args, expected_substrings",
+    [
+        # Help command works
+        pytest.param(["--help"], ["architecture documentation generator"], id="help"),
+        # Version command
+        pytest.param(["version"], ["Archy"], id="version"),
+        # Fresh command with default arguments
+        pytest.param(["fresh", "--dry-run"], ["Creating"], id="fresh"),
+        # Fresh command with various flags
+        pytest.param(
+            [
+                "fresh",
+                "--folder",
+                "backend",
+                "--doc",
+                "api.md",
+                "--name",
+                "TestProject",
+                "--tool",
+                "fabric",
+                "--dry-run",
+            ],
+            [],
+            id="fresh-with-flags",
+            marks=pytest.mark.skip(
+                reason="Temporarily disabled - needs debugging of dry-run mode with specific flags"
+            ),
+        ),
+        # Update command with default arguments
+        pytest.param(
+            ["update", "--dry-run"],
+            ["Updating"],
+            id="update",
+            marks=pytest.mark.skip(
+                reason="Temporarily disabled - needs debugging of dry-run mode with update command"
+            ),
+        ),
+        # Test command
+        pytest.param(["test", "--dry-run"], ["Testing", "cursor-agent"], id="test"),
+        # Test command with fabric backend
+        pytest.param(
+            ["test", "--tool", "fabric", "--dry-run"],
+            ["fabric"],
+            id="test-with-fabric",
+        ),
+    ],
 )
-def test_fresh_command_with_flags():
-    """Test fresh command with various flags."""
-    result = runner.invoke(
-        app,
-        [
-            "fresh",
-            "--folder",
-            "backend",
-            "--doc",
-            "api.md",
-            "--name",
-            "TestProject",
-            "--tool",
-            "fabric",
-            "--dry-run",
-        ],
-    )
-    assert result.exit_code == 0
-
-
-@pytest.mark.skip(
-    reason="Temporarily disabled - needs debugging of dry-run mode with update command"
-)
-def test_update_command_basic():
-    """Test update command with default arguments."""
-    result = runner.invoke(app, ["update", "--dry-run"])
-    assert result.exit_code == 0
-    assert "Updating" in result.stdout
-
-
-def test_test_command():
-    """Test the test command."""
-    result = runner.invoke(app, ["test", "--dry-run"])
-    assert result.exit_code == 0
-    assert "Testing" in result.stdout
-    assert "cursor-agent" in result.stdout
-
-
-def test_test_command_with_fabric():
-    """Test the test command with fabric backend."""
-    result = runner.invoke(app, ["test", "--tool", "fabric", "--dry-run"])
+def test_cli_command(args, expected_substrings):
+    """Test that CLI commands succeed and print the expected output."""
+    result = runner.invoke(app, args, catch_exceptions=False)
     assert result.exit_code == 0
-    assert "fabric" in result.stdout
+    for expected in expected_substrings:
+        assert expected in result.stdout
 
 
 def test_invalid_backend():
@@ -0,0 +1,411 @@
+"""
+Tests for git operations.
+
+Runs GitRepository against small throwaway repositories created with git.
+"""
+
+import re
+import subprocess
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from archy.core.git_ops import (
+    _DIFF_TREE_SENTINEL,
+    ChangeType,
+    GitRepository,
+    PRDiff,
+    _classify_path,
+    _GitBatchProcess,
+    _parse_raw_numstat,
+)
+from archy.exceptions import ArchyGitError
+
+
+def _git(cwd: Path, *args: str) -> str:
+    """Run a git command with a fixed identity and return its stdout."""
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def repo_path(tmp_path: Path) -> Path:
+    """A repository with one commit on main."""
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "app.py").write_text("print('hello')\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+@pytest.fixture
+def git_repo(repo_path: Path):
+    """GitRepository for repo_path, with its git processes stopped afterwards."""
+    repository = GitRepository(repo_path)
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def feature_repo(repo_path: Path) -> Iterator[GitRepository]:
+    """A repository whose feature branch touches files in every way."""
+    (repo_path / "old_name.py").write_text("".join(f"line {i}\n" for i in range(20)))
+    (repo_path / "gone.py").write_text("a\nb\n")
+    (repo_path / "logo.bin").write_bytes(b"\0\1\2")
+    _git(repo_path, "add", ".")
+    _git(repo_path, "commit", "-q", "-m", "base")
+
+    _git(repo_path, "checkout", "-q", "-b", "feature")
+    (repo_path / "app.py").write_text("print('hello, world')\nprint('bye')\n")
+    (repo_path / "src").mkdir()
+    (repo_path / "src" / "café kit.py").write_text("x = 1\ny = 2\nz = 3\n")
+    (repo_path / "src" / "deps.lock").write_text("pinned\n")
+    (repo_path / "gone.py").unlink()
+    (repo_path / "old_name.py").rename(repo_path / "new_name.py")
+    (repo_path / "logo.bin").write_bytes(b"\0\3\4")
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", "feature")
+
+    repository = GitRepository(repo_path)
+    yield repository
+    repository.close()
+
+
+def _summary(changes):
+    """Changes as comparable (type, path, old path, added, removed) tuples."""
+    return {
+        (
+            change.change_type,
+            change.file_path,
+            change.old_path,
+            change.lines_added,
+            change.lines_removed,
+        )
+        for change in changes
+    }
+
+
+def test_changed_files_with_renames(feature_repo):
+    """Test statuses and line counts for every kind of change."""
+    changes = feature_repo.get_changed_files("main", find_renames=True)
+    assert _summary(changes) == {
+        (ChangeType.MODIFIED, "app.py", None, 2, 1),
+        (ChangeType.ADDED, "src/café kit.py", None, 3, 0),
+        (ChangeType.ADDED, "src/deps.lock", None, 1, 0),
+        (ChangeType.DELETED, "gone.py", None, 0, 2),
+        (ChangeType.RENAMED, "new_name.py", "old_name.py", 0, 0),
+        (ChangeType.MODIFIED, "logo.bin", None, 0, 0),  # Binary: no counts
+    }
+
+
+def test_changed_files_without_renames(feature_repo):
+    """Test that a rename is a deletion plus an addition by default."""
+    changes = _summary(feature_repo.get_changed_files("main"))
+    assert (ChangeType.DELETED, "old_name.py", None, 0, 20) in changes
+    assert (ChangeType.ADDED, "new_name.py", None, 20, 0) in changes
+    assert not any(change[0] == ChangeType.RENAMED for change in changes)
+
+
+def test_changed_files_path_filter_and_exclusions(feature_repo):
+    """Test that path_filter and excluded_re narrow the changed files."""
+    changes = feature_repo.get_changed_files(
+        "main", path_filter="src/", excluded_re=re.compile(r"\.lock")
+    )
+    assert [change.file_path for change in changes] == ["src/café kit.py"]
+
+
+def test_changed_files_in_shallow_clone(repo_path, tmp_path_factory):
+    """Test that a clone without the merge base diffs against the base itself."""
+    _git(repo_path, "checkout", "-q", "-b", "feature")
+    (repo_path / "feature.py").write_text("x = 1\n")
+    _git(repo_path, "add", ".")
+    _git(repo_path, "commit", "-q", "-m", "feature")
+    _git(repo_path, "checkout", "-q", "main")
+    (repo_path / "app.py").write_text("print('hello')\nprint('main')\n")
+    _git(repo_path, "commit", "-q", "-am", "main")
+
+    # Depth-1 clone of the feature branch plus a depth-1 fetch of main, as
+    # CI checkouts do: the two tips share no history
+    clone_path = tmp_path_factory.mktemp("clone")
+    _git(
+        clone_path,
+        "clone",
+        "-q",
+        "--depth",
+        "1",
+        "--branch",
+        "feature",
+        repo_path.as_uri(),
+        ".",
+    )
+    _git(
+        clone_path,
+        "fetch",
+        "-q",
+        "--depth",
+        "1",
+        "origin",
+        "main:refs/remotes/origin/main",
+    )
+
+    repository = GitRepository(clone_path)
+    try:
+        changes = _summary(repository.get_changed_files("main"))
+    finally:
+        repository.close()
+
+    assert changes == {
+        (ChangeType.ADDED, "feature.py", None, 1, 0),
+        (ChangeType.MODIFIED, "app.py", None, 0, 1),
+    }
+
+
+def test_tracked_files_skip_missing_files(git_repo, repo_path):
+    """Test that deleted and absent skip-worktree files are not listed."""
+    for name in ("deleted.py", "sparse.py", "kept.py"):
+        (repo_path / name).write_text("x = 1\n")
+    _git(repo_path, "add", ".")
+    _git(repo_path, "commit", "-q", "-m", "more files")
+
+    (repo_path / "deleted.py").unlink()
+    _git(repo_path, "update-index", "--skip-worktree", "sparse.py", "kept.py")
+    (repo_path / "sparse.py").unlink()
+
+    assert git_repo.get_all_tracked_files() == ["app.py", "kept.py"]
+
+
+def test_parse_raw_numstat_rejects_mismatched_records():
+    """Test that --raw and --numstat records that do not pair up are an error."""
+    output = b":100644 100644 aaa bbb M\0app.py\0:000000 100644 000 ccc A\0new.py\0"
+    output += b"1\t1\tapp.py\0"
+    with pytest.raises(ArchyGitError, match="Mismatched"):
+        _parse_raw_numstat(output)
+
+
+def test_changed_files_empty_diff(git_repo):
+    """Test that a branch without changes yields an empty list."""
+    assert git_repo.get_changed_files("main") == []
+    # The diff-tree process stays in sync for the next request
+    assert git_repo.get_changed_files("main") == []
+
+
+def test_batch_process_reads_response_up_to_terminator(repo_path):
+    """Test the diff-tree --stdin sentinel protocol directly."""
+    head = _git(repo_path, "rev-parse", "HEAD").strip()
+    process = _GitBatchProcess(repo_path, "diff-tree", "--stdin", "--always", "-z")
+    try:
+        request = f"{head} {head}\n".encode() + _DIFF_TREE_SENTINEL
+        for _ in range(2):
+            response = process.request(request, _DIFF_TREE_SENTINEL)
+            assert response == f"{head}\0".encode() + _DIFF_TREE_SENTINEL
+
+        # An unknown commit produces no header, but still ends at the sentinel
+        missing = "0" * 39 + "1"
+        request = f"{missing} {head}\n".encode() + _DIFF_TREE_SENTINEL
+        assert process.request(request, _DIFF_TREE_SENTINEL) == _DIFF_TREE_SENTINEL
+    finally:
+        process.close()
+
+
+def test_batch_process_failure_reports_stderr(tmp_path):
+    """Test that a git process that exits reports git's error output."""
+    process = _GitBatchProcess(tmp_path, "cat-file", "--batch-check")
+    with pytest.raises(ArchyGitError, match="not a git repository"):
+        process.request(b"HEAD\n", b"\n")
+    assert not process.alive
+
+
+def test_dead_batch_process_is_replaced(git_repo):
+    """Test that a batch process that died is restarted on next use."""
+    process = git_repo._batch_process("cat-file", "--batch-check")
+    process.close()
+
+    replacement = git_repo._batch_process("cat-file", "--batch-check")
+    assert replacement is not process
+    assert git_repo._resolve_commit("HEAD")
+
+
+@pytest.fixture
+def pr_fetcher(tmp_path, monkeypatch):
+    """GitRepository whose PR head lookups and downloads are stubbed."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    repository = GitRepository(Path("."), dry_run=True)
+    repository.head_sha = "a" * 40
+    repository.downloads = []
+
+    def download(repo, pr_number):
+        repository.downloads.append(repository.head_sha)
+        return f"diff for {repository.head_sha}\n".encode()
+
+    monkeypatch.setattr(
+        repository, "_fetch_pr_head_sha", lambda repo, pr_number: repository.head_sha
+    )
+    monkeypatch.setattr(repository, "_download_pr_diff", download)
+    return repository
+
+
+def _cached_pr_diffs(tmp_path):
+    """Names of the PR diffs in the cache under tmp_path."""
+    return sorted(path.name for path in tmp_path.glob("archy/pr-diffs/*/*"))
+
+
+def test_pr_diff_cache_hit(pr_fetcher, tmp_path):
+    """Test that a PR diff is downloaded once per head commit."""
+    first = pr_fetcher._fetch_pr_diff("org/service", 7)
+    assert pr_fetcher._fetch_pr_diff("org/service", 7) == first
+    assert pr_fetcher.downloads == ["a" * 40]
+    assert _cached_pr_diffs(tmp_path) == [f"7-{'a' * 40}.diff.gz"]
+
+
+def test_pr_diff_cache_evicts_old_heads(pr_fetcher, tmp_path):
+    """Test that a new PR head replaces the diff cached for the old one."""
+    pr_fetcher._fetch_pr_diff("org/service", 7)
+    pr_fetcher._fetch_pr_diff("org/service", 17)
+    pr_fetcher.head_sha = "b" * 40
+    assert (
+        pr_fetcher._fetch_pr_diff("org/service", 7) == f"diff for {'b' * 40}\n".encode()
+    )
+    assert _cached_pr_diffs(tmp_path) == [
+        f"17-{'a' * 40}.diff.gz",
+        f"7-{'b' * 40}.diff.gz",
+    ]
+
+
+def test_pr_diff_cache_corrupt_entry(pr_fetcher, tmp_path):
+    """Test that a corrupt cached diff is treated as a miss."""
+    pr_fetcher._fetch_pr_diff("org/service", 7)
+    (cache_file,) = tmp_path.glob("archy/pr-diffs/*/*")
+    cache_file.write_bytes(b"\x1f\x8b\x08\x00" + b"garbage" * 10)
+
+    assert (
+        pr_fetcher._fetch_pr_diff("org/service", 7) == f"diff for {'a' * 40}\n".encode()
+    )
+    assert pr_fetcher.downloads == ["a" * 40, "a" * 40]
+
+
+PR_DIFF = b"""\
+diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,2 +1,2 @@
+ import os
+-print('hello')
++print('hello, world')
+diff --git "a/src/caf\\303\\251.py" "b/src/caf\\303\\251.py"
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ "b/src/caf\\303\\251.py"
+@@ -0,0 +1,3 @@
++x = 1
++y = 2
++z = 3
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+index 4444444..0000000
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-a
+-b
+diff --git a/old name.txt "b/new \\303\\261ame.txt"
+similarity index 100%
+rename from old name.txt
+rename to "new \\303\\261ame.txt"
+diff --git a/a b/c.py b/a b/c.py
+new file mode 100644
+index 0000000..5555555
+--- /dev/null
++++ b/a b/c.py\t
+@@ -0,0 +1 @@
++k
+"""
+
+
+def test_parse_pr_diff_headers():
+    """Test plain, quoted, added, deleted and renamed file headers."""
+    pr_diff = GitRepository(Path("."), dry_run=True)._parse_pr_diff(
+        PR_DIFF, "org/service", 7, "", []
+    )
+    assert [
+        (
+            change.change_type,
+            change.file_path,
+            change.old_path,
+            change.lines_added,
+            change.lines_removed,
+        )
+        for change in pr_diff.changes
+    ] == [
+        ("Modified", "src/app.py", None, 1, 1),
+        ("Added", "src/café.py", None, 3, 0),
+        ("Deleted", "gone.py", None, 0, 2),
+        ("Renamed", "new ñame.txt", "old name.txt", 0, 0),
+        ("Added", "a b/c.py", None, 1, 0),
+    ]
+
+
+def test_parse_pr_diff_unparsable_header_does_not_leak_counts():
+    """Test that lines under an unrecognised header are not counted elsewhere."""
+    diff_content = PR_DIFF.replace(
+        b'diff --git "a/src/caf\\303\\251.py" "b/src/caf\\303\\251.py"',
+        b"diff --git garbled",
+    ).replace(b'+++ "b/src/caf\\303\\251.py"', b"+++ garbled")
+    pr_diff = GitRepository(Path("."), dry_run=True)._parse_pr_diff(
+        diff_content, "org/service", 7, "", []
+    )
+    app_change = pr_diff.changes[0]
+    assert app_change.file_path == "src/app.py"
+    assert (app_change.lines_added, app_change.lines_removed) == (1, 1)
+    assert "src/café.py" not in {change.file_path for change in pr_diff.changes}
+
+
+def _pr_diff(diff_content: bytes) -> PRDiff:
+    """PRDiff holding diff_content and no parsed changes."""
+    return PRDiff(
+        repo="org/service",
+        number=7,
+        changes=[],
+        total_changes=0,
+        summary="",
+        compressed_diff=zlib.compress(diff_content) if diff_content else b"",
+    )
+
+
+def test_mentioned_names_across_chunk_boundary():
+    """Test that a name split between two streamed chunks is still found."""
+    # iter_raw_diff yields 64 KiB chunks; "Billing" starts 3 bytes before
+    # the first boundary
+    diff_content = b"x" * ((1 << 16) - 3) + b"Billing-API" + b"y" * 100
+    pr_diff = _pr_diff(diff_content)
+    assert pr_diff.mentioned_names(["billing", "payments"]) == {"billing"}
+
+
+def test_mentioned_names_empty_diff():
+    """Test that an empty diff mentions nothing."""
+    assert _pr_diff(b"").mentioned_names(["billing"]) == set()
+
+
+@pytest.mark.parametrize(
+    "file_path_lower, category",
+    [
+        ("specs/api.json", "api_specifications"),  # api.json before api
+        ("docs/swagger/api.yaml", "api_specifications"),  # swagger before api
+        ("src/api/handlers.py", "api_endpoints"),
+        ("src/db/config.py", "database_changes"),  # db before config
+        ("settings/config.yaml", "config_changes"),
+        ("readme.md", None),
+    ],
+)
+def test_classify_path_priority(file_path_lower, category):
+    """Test that the first matching category in priority order wins."""
+    assert _classify_path(file_path_lower) == category